@@ -2,6 +2,21 @@ from __future__ import annotations
 
 from typing import Any, Dict, List, Optional
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# 호출마다 새 TCP+TLS 연결을 열지 않도록 커넥션 풀 재사용
+_SESSION = requests.Session()
+_SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=16,
+        max_retries=Retry(
+            total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504]
+        ),
+    ),
+)
 
 
 def kakao_keyword_search(
@@ -46,7 +61,7 @@ def kakao_keyword_search(
     if category:
         params["category_group_code"] = category
 
-    r = requests.get(url, headers=headers, params=params, timeout=10)
+    r = _SESSION.get(url, headers=headers, params=params, timeout=10)
     r.raise_for_status()
     data = r.json()
     return data.get("documents", []) or []
@@ -1,13 +1,21 @@
 from __future__ import annotations
 
+import copy
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Dict, List, Tuple
 
 import altair as alt
 import folium
+from branca.colormap import StepColormap
+import numpy as np
 import pandas as pd
 import requests
 import streamlit as st
-from streamlit_folium import st_folium
+import streamlit.components.v1 as components
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 import osm_backend as ob
 from kakaomap import kakao_keyword_search
@@ -18,8 +26,33 @@ st.title("SeoulTREK🥾")
 st.markdown(":green[서울의 트래킹 코스를 한눈에]")
 
 
+# 커넥션 풀 재사용(캐시 미스마다 TCP+TLS 핸드셰이크 방지) + 일시 오류 재시도
+_SESSION = requests.Session()
+_SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=16,
+        max_retries=Retry(
+            total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504]
+        ),
+    ),
+)
+
+# ====== API keys ======
+@st.cache_resource
+def _keys() -> Dict[str, str]:
+    # st.secrets 조회는 rerun마다 반복하지 않도록 한 번만 스냅샷
+    return {
+        "ow": st.secrets.get("OPENWEATHER_API_KEY", ""),
+        "kakao": st.secrets.get("KAKAO_REST_API_KEY", "")
+        or st.secrets.get("KAKAO_REST_KEY", ""),
+        "ors": st.secrets.get("ORS_API_KEY", ""),
+    }
+
+
 # ====== Weather(OpenWeather) ======
-OPENWEATHER_API_KEY = st.secrets.get("OPENWEATHER_API_KEY", "")
+OPENWEATHER_API_KEY = _keys()["ow"]
 
 
 @st.cache_data(ttl=600)
@@ -32,7 +65,7 @@ def get_weather_openweather(lat: float, lon: float, api_key: str) -> Dict[str, A
         "units": "metric",
         "lang": "kr",
     }
-    r = requests.get(url, params=params, timeout=10)
+    r = _SESSION.get(url, params=params, timeout=10)
     r.raise_for_status()
     return r.json()
 
@@ -113,14 +146,32 @@ def judge_outdoor(w: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
+# 간단 3단계 색상: <120m green / <300m yellow / 그 외 orange
+_ELEV_BINS = np.array([120.0, 300.0])
+_ELEV_COLORS = np.array(["#2ecc71", "#f1c40f", "#e67e22"])
+
+# ColorLine은 colormap을 리스트로 주면 vmin/vmax를 입력 color 값의
+# 최솟값/최댓값으로 정규화해서, 코스가 3단계 중 2단계만 지나면 색이
+# 어긋난다. 구간 인덱스(0/1/2) -> 색을 고정 범위로 못 박은 StepColormap 사용.
+# (ColorLine은 색 계산에만 쓰고 자식으로 붙이지 않으므로 공유해도 안전)
+_ELEV_STEP_CMAP = StepColormap(
+    _ELEV_COLORS.tolist(), index=[0, 1, 2, 3], vmin=0, vmax=3
+)
+
+
 def elev_color(elev: float) -> str:
-    # 간단 3단계 색상
-    if elev < 120:
-        return "#2ecc71"  # green
-    elif elev < 300:
-        return "#f1c40f"  # yellow
-    else:
-        return "#e67e22"  # orange
+    return str(_ELEV_COLORS[int(np.digitize(elev, _ELEV_BINS))])
+
+
+def _clip_coords_to_bbox(coords, bbox) -> list:
+    """bbox 밖 좌표를 벡터 연산으로 걸러 folium에 넘기는 점 개수를 줄인다."""
+    s, w_, n, e = bbox
+    lat = np.asarray([p[0] for p in coords], dtype=np.float32)
+    lon = np.asarray([p[1] for p in coords], dtype=np.float32)
+    mask = (lat >= s) & (lat <= n) & (lon >= w_) & (lon <= e)
+    if mask.sum() < 2:  # 전부 밖이면 원본 유지(빈 폴리라인 방지)
+        return coords
+    return list(zip(lat[mask].tolist(), lon[mask].tolist()))
 
 
 def _bounds_from_latlon_list(latlon_list):
@@ -130,10 +181,18 @@ def _bounds_from_latlon_list(latlon_list):
 
 
 # ====== Cached backend ======
-@st.cache_data(ttl=60 * 60)
+def _data_dir_mtime(path: str = "data") -> float:
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return 0.0
+
+
+@st.cache_resource(show_spinner=False)
 def cached_official_index(
-    bbox: Tuple[float, float, float, float],
-) -> List[Dict[str, Any]]:
+    bbox: Tuple[float, float, float, float], data_mtime: float
+) -> ob.OfficialIndex:
+    # data_mtime이 캐시 키에 들어가므로 GPX 폴더가 바뀌지 않는 한 한 번만 스캔
     return ob.load_official_gpx_index("data", bbox=bbox, max_files=1500)
 
 
@@ -141,22 +200,41 @@ def cached_official_index(
 def cached_courses(
     bbox: Tuple[float, float, float, float], max_relations: int, use_public: bool
 ) -> pd.DataFrame:
-    official_index = cached_official_index(bbox) if use_public else None
+    official_index = (
+        cached_official_index(bbox, _data_dir_mtime()) if use_public else None
+    )
     courses = ob.build_courses(
         bbox, max_relations=max_relations, official_index=official_index
     )
     if not courses:
         return pd.DataFrame()
     df = pd.DataFrame(courses)
-    df = df.sort_values(["score", "distance_km"], ascending=False).reset_index(
-        drop=True
-    )
+    # 상위 max_relations개만 유지(전체 정렬 대신 O(n log k))
+    df = df.nlargest(max_relations, ["score", "distance_km"]).reset_index(drop=True)
     return df
 
 
-@st.cache_data(ttl=60 * 20)
+# coords 리스트 전체를 해시하면 O(n)이라, 긴 시퀀스의 캐시 키는
+# (길이, 양끝점) 요약으로 충분. 단,
+# - 해시 함수의 반환값도 다시 hash_funcs를 타므로 튜플을 돌려주면
+#   무한 재귀(RecursionError)가 난다 → 문자열 키를 돌려준다
+# - bbox 같은 짧은 고정 길이 튜플은 전체 내용을 키에 넣는다
+#   (요약만 쓰면 (s,w,n,e)에서 w/n이 키에서 빠진다)
+def _cheap_seq_key(seq) -> str:
+    if len(seq) <= 8:
+        return repr(seq)
+    return repr((type(seq).__name__, len(seq), seq[0], seq[-1]))
+
+
+_CHEAP_SEQ_HASH = {list: _cheap_seq_key, tuple: _cheap_seq_key}
+
+
+# ORS는 호출당 수 초짜리 네트워크 비용이라 하루 단위로 길게 캐시
+@st.cache_data(
+    ttl=86400, max_entries=256, show_spinner=False, hash_funcs=_CHEAP_SEQ_HASH
+)
 def cached_elevation_profile(coords_latlon, ors_api_key: str):
-    return ob.elevation_profile(coords_latlon, api_key=ors_api_key)
+    return ob.elevation_profile(list(coords_latlon), api_key=ors_api_key)
 
 
 @st.cache_data(ttl=60 * 10)
@@ -180,6 +258,19 @@ def cached_kakao_places(
     )
 
 
+@st.cache_resource
+def _base_map(
+    lat: float, lon: float, bbox: Tuple[float, float, float, float]
+) -> folium.Map:
+    """타일/중심/외곽선만 있는 베이스 지도. rerun마다 deepcopy해서 재사용."""
+    m = folium.Map(location=[lat, lon], zoom_start=13, tiles="OpenStreetMap")
+    s, w_, n, e = bbox
+    folium.Rectangle(
+        bounds=[[s, w_], [n, e]], color="#0984e3", weight=2, fill=False
+    ).add_to(m)
+    return m
+
+
 def _tooltip_one_line(name: str, distance_km: float, difficulty: str) -> folium.Tooltip:
     html = (
         "<div style='white-space:nowrap; font-size:12px;'>"
@@ -189,15 +280,33 @@ def _tooltip_one_line(name: str, distance_km: float, difficulty: str) -> folium.
     return folium.Tooltip(html, sticky=True)
 
 
-def _kakao_popup_compact(name: str, url: str) -> str:
-    safe_url = url or "#"
-    return (
-        "<div style='display:flex; align-items:center; gap:10px; "
-        "max-width:260px; white-space:nowrap;'>"
-        f"<div style='font-weight:700; overflow:hidden; text-overflow:ellipsis;'>{name}</div>"
-        f"<a href='{safe_url}' target='_blank' style='text-decoration:none;'>상세보기</a>"
-        "</div>"
-    )
+# 맥주: 보라 / 카페: 분홍
+_KAKAO_CAT_COLORS = {"beer": "#6c5ce7", "cafe": "#e84393"}
+
+
+def _kakao_features(
+    places: List[Dict[str, str]], fallback_name: str, cat: str
+) -> List[Dict[str, Any]]:
+    """카카오 장소 목록 -> GeoJSON Feature 리스트(마커는 JS가 한 번에 그림)"""
+    features: List[Dict[str, Any]] = []
+    for p in places:
+        try:
+            lat_p = float(p.get("y", 0))
+            lon_p = float(p.get("x", 0))
+        except Exception:
+            continue
+        features.append(
+            {
+                "type": "Feature",
+                "geometry": {"type": "Point", "coordinates": [lon_p, lat_p]},
+                "properties": {
+                    "name": p.get("place_name", "") or fallback_name,
+                    "url": p.get("place_url", "") or "#",
+                    "cat": cat,
+                },
+            }
+        )
+    return features
 
 
 # ====== Sidebar ======
@@ -269,7 +378,7 @@ if df.empty:
     st.stop()
 
 # difficulty filter (중복 선택 가능)
-df_use = df[df["difficulty"].isin(diff_filter)].copy() if diff_filter else df.copy()
+df_use = df[df["difficulty"].isin(diff_filter)] if diff_filter else df
 
 if df_use.empty:
     st.info(
@@ -277,46 +386,81 @@ if df_use.empty:
     )
     st.stop()
 
-df_use = df_use.sort_values("score", ascending=False).head(topk).reset_index(drop=True)
+# 전체 정렬 대신 top-k만 추출 (복사본 불필요: nlargest가 새 프레임을 반환)
+df_use = df_use.nlargest(topk, "score").reset_index(drop=True)
 
-selected = st.selectbox("상세로 볼 코스 선택", df_use["name"].tolist(), index=0)
-row = df_use[df_use["name"] == selected].iloc[0].to_dict()
+# bbox 밖으로 길게 이어지는 코스는 지도에 보이는 구간만 남긴다
+df_use["coords"] = [_clip_coords_to_bbox(c, bbox) for c in df_use["coords"]]
+if "coords_simplified" in df_use.columns:
+    df_use["coords_simplified"] = [
+        _clip_coords_to_bbox(c, bbox) for c in df_use["coords_simplified"]
+    ]
 
-# ====== Kakao places (near selected course end) ======
+# 지도 폴리라인 단순화 epsilon(도 단위): 좁은 지역일수록 디테일 유지
+rdp_eps = max(1e-5, 5e-5 * (max(radius_km, 1.0) / 30.0))
+
+course_names = df_use["name"].tolist()
+# 이름 -> row dict 매핑을 한 번 만들어 rerun마다 불리언 스캔을 피한다
+_by_name = {n: df_use.iloc[i].to_dict() for i, n in enumerate(course_names)}
+
+selected = st.selectbox("상세로 볼 코스 선택", course_names, index=0)
+row = _by_name[selected]
+
+# ====== External APIs (Kakao / ORS / OpenWeather 동시 호출) ======
+# 서로 독립인 네트워크 호출을 병렬로 걸어 대기 시간을 sum이 아닌 max로 줄인다
 kakao_beer: List[Dict[str, str]] = []
 kakao_cafe: List[Dict[str, str]] = []
 kakao_center: Tuple[float, float] | None = None
+ors_key = _keys()["ors"]
+kakao_key = _keys()["kakao"]
+
+f_beer = f_cafe = f_elev = f_weather = None
+with ThreadPoolExecutor(max_workers=4) as _ex:
+    if show_kakao and kakao_key:
+        end_lon = float(row["end_lon"])
+        end_lat = float(row["end_lat"])
+        kakao_center = (end_lat, end_lon)
+        f_beer = _ex.submit(
+            cached_kakao_places,
+            query="맥주",
+            category="FD6",
+            x=end_lon,
+            y=end_lat,
+            radius_m=int(kakao_radius_m),
+            size=int(kakao_size),
+            api_key=kakao_key,
+        )
+        f_cafe = _ex.submit(
+            cached_kakao_places,
+            query="카페",
+            category="CE7",
+            x=end_lon,
+            y=end_lat,
+            radius_m=int(kakao_radius_m),
+            size=int(kakao_size),
+            api_key=kakao_key,
+        )
+    if show_elevation and ors_key:
+        # 캐시 키가 안정적이도록 tuple-of-tuples로 변환해 전달
+        # (backend가 이미 컬럼형 DataFrame으로 돌려준다)
+        f_elev = _ex.submit(
+            cached_elevation_profile, tuple(map(tuple, row["coords"])), ors_key
+        )
+    if OPENWEATHER_API_KEY:
+        f_weather = _ex.submit(
+            get_weather_openweather,
+            float(row["start_lat"]),
+            float(row["start_lon"]),
+            OPENWEATHER_API_KEY,
+        )
 
-if show_kakao:
+# ====== Kakao places (near selected course end) ======
+if show_kakao and not kakao_key:
+    st.sidebar.info("KAKAO_REST_API_KEY가 없어 카카오 마커를 숨깁니다.")
+elif f_beer is not None and f_cafe is not None:
     try:
-        kakao_key = st.secrets.get("KAKAO_REST_API_KEY", "") or st.secrets.get(
-            "KAKAO_REST_KEY", ""
-        )
-        if kakao_key:
-            end_lon = float(row["end_lon"])
-            end_lat = float(row["end_lat"])
-            kakao_center = (end_lat, end_lon)
-
-            kakao_beer = cached_kakao_places(
-                query="맥주",
-                category="FD6",
-                x=end_lon,
-                y=end_lat,
-                radius_m=int(kakao_radius_m),
-                size=int(kakao_size),
-                api_key=kakao_key,
-            )
-            kakao_cafe = cached_kakao_places(
-                query="카페",
-                category="CE7",
-                x=end_lon,
-                y=end_lat,
-                radius_m=int(kakao_radius_m),
-                size=int(kakao_size),
-                api_key=kakao_key,
-            )
-        else:
-            st.sidebar.info("KAKAO_REST_API_KEY가 없어 카카오 마커를 숨깁니다.")
+        kakao_beer = f_beer.result()
+        kakao_cafe = f_cafe.result()
     except Exception as e:
         st.sidebar.warning(
             "Kakao Local 호출 실패. API 키와 네트워크/IP 제한을 확인하세요."
@@ -324,73 +468,116 @@ if show_kakao:
         st.sidebar.exception(e)
 
 # ====== Elevation (for panel + selected route coloring) ======
-ors_key = st.secrets.get("ORS_API_KEY", "")
-prof: List[Dict[str, Any]] = []
+df_prof: pd.DataFrame | None = None
 elev_available = False
 
-if show_elevation and ors_key:
+if f_elev is not None:
     try:
-        prof = cached_elevation_profile(row["coords"], ors_key) or []
-        # lat/lon/elev_m이 있어야 지도 색칠 가능
-        elev_available = (
-            len(prof) >= 2
-            and isinstance(prof[0], dict)
-            and ("lat" in prof[0] and "lon" in prof[0] and "elev_m" in prof[0])
-        )
+        df_prof = f_elev.result()
+        if df_prof is not None and len(df_prof) >= 2:
+            # lat/lon/elev_m이 있어야 지도 색칠 가능
+            elev_available = {"lat", "lon", "elev_m"}.issubset(df_prof.columns)
+        else:
+            df_prof = None
     except Exception:
-        prof = []
+        df_prof = None
         elev_available = False
 
-# ====== Layout ======
-col_map, col_side = st.columns([1.35, 1], gap="large")
+# ====== Map build ======
+# 프레임/좌표 리스트 전체를 해시하지 않도록 캐시 키는 싼 요약값으로 만든다
+# (여기서도 반환값은 컨테이너가 아닌 문자열이어야 재귀 해시를 타지 않는다)
+_MAP_HASH_FUNCS = {
+    pd.DataFrame: lambda d: repr(
+        (
+            d.shape,
+            tuple(d.columns),
+            tuple(d["name"]) if "name" in d.columns else len(d),
+        )
+    ),
+    **_CHEAP_SEQ_HASH,
+}
 
-with col_map:
-    st.subheader("추천 코스")
 
+@st.cache_data(show_spinner=False, hash_funcs=_MAP_HASH_FUNCS)
+def _render_map_html(
+    df_use: pd.DataFrame,
+    row: Dict[str, Any],
+    bbox: Tuple[float, float, float, float],
+    df_prof: pd.DataFrame | None,
+    elev_available: bool,
+    kakao_beer: List[Dict[str, str]],
+    kakao_cafe: List[Dict[str, str]],
+    kakao_center: Tuple[float, float] | None,
+    rdp_eps: float,
+) -> str:
+    """지도를 만들어 렌더된 HTML을 돌려준다. 입력이 같으면 rerun에서 재사용."""
     # ✅ 초기 location은 선택 코스 시작점으로
-    map_center = [float(row["start_lat"]), float(row["start_lon"])]
-    m = folium.Map(location=map_center, zoom_start=13, tiles="OpenStreetMap")
-
-    # bbox outline
-    s, w_, n, e = bbox
-    folium.Rectangle(
-        bounds=[[s, w_], [n, e]], color="#0984e3", weight=2, fill=False
-    ).add_to(m)
+    # 베이스 지도(타일+bbox 외곽선)는 캐시해두고 복사만 한다
+    m = copy.deepcopy(
+        _base_map(float(row["start_lat"]), float(row["start_lon"]), bbox)
+    )
 
-    # draw routes
+    # draw routes (itertuples: iterrows와 달리 행마다 Series를 만들지 않음)
     selected_name = row["name"]
-    for i, r in df_use.iterrows():
-        is_selected = r["name"] == selected_name
+    for r in df_use.itertuples(index=False):
+        is_selected = r.name == selected_name
 
         # ✅ 선택 코스는 고도(ORS) 프로파일이 있으면 구간별 색칠
-        if is_selected and elev_available and isinstance(prof, list) and len(prof) >= 2:
-            pts = []
-            for p in prof:
-                try:
-                    pts.append((float(p["lat"]), float(p["lon"]), float(p["elev_m"])))
-                except Exception:
-                    pts = []
-                    break
-
-            if len(pts) >= 2:
-                for j in range(len(pts) - 1):
-                    lat1, lon1, e1 = pts[j]
-                    lat2, lon2, _ = pts[j + 1]
+        if is_selected and elev_available and df_prof is not None:
+            plats = df_prof["lat"].to_numpy()
+            plons = df_prof["lon"].to_numpy()
+            pelevs = df_prof["elev_m"].to_numpy()
+
+            # RDP로 점을 줄이되 같은 인덱스로 고도도 줄여 색이 어긋나지 않게
+            keep = ob.rdp_indices(list(zip(plats.tolist(), plons.tolist())), rdp_eps)
+            if len(keep) >= 2:
+                plats = plats[keep]
+                plons = plons[keep]
+                pelevs = pelevs[keep]
+
+            if len(plats) >= 2:
+                positions = list(zip(plats.tolist(), plons.tolist()))
+                # 고도를 elev_color와 같은 3단계 구간으로 양자화
+                bins = np.digitize(pelevs, _ELEV_BINS)
+
+                if bins.min() == bins.max():
+                    # 전 구간이 같은 색이면 단일 PolyLine이 가장 싸다
                     folium.PolyLine(
-                        [(lat1, lon1), (lat2, lon2)],
-                        color=elev_color(e1),
+                        positions,
+                        color=elev_color(float(pelevs[0])),
                         weight=8,
                         opacity=0.95,
                         tooltip=_tooltip_one_line(
-                            str(r["name"]),
-                            float(r["distance_km"]),
-                            str(r["difficulty"]),
+                            str(r.name), float(r.distance_km), str(r.difficulty)
                         ),
                     ).add_to(m)
+                else:
+                    # 세그먼트별 PolyLine N개 대신 단일 ColorLine 레이어
+                    cl = folium.ColorLine(
+                        positions=positions,
+                        colors=bins[:-1].tolist(),
+                        colormap=_ELEV_STEP_CMAP,
+                        weight=8,
+                        opacity=0.95,
+                    )
+                    # ColorLine은 색별 자식 PolyLine으로 그려지므로
+                    # 단색 분기처럼 호버 툴팁이 보이려면 자식마다 달아준다
+                    # (Tooltip도 부모에 묶이는 요소라 자식별로 새로 만든다)
+                    for seg_line in list(cl._children.values()):
+                        seg_line.add_child(
+                            _tooltip_one_line(
+                                str(r.name), float(r.distance_km), str(r.difficulty)
+                            )
+                        )
+                    cl.add_to(m)
                 continue  # 선택 코스는 이미 그렸으니 다음 코스로
 
         # 나머지(또는 고도 데이터 없을 때)는 단색
-        latlon = r["coords"]
+        # 코스 생성 시 미리 단순화해둔 좌표에서 시작하고,
+        # 넓은 지역이면 줌에 맞춰 한 번 더 줄인다
+        latlon = getattr(r, "coords_simplified", None) or r.coords
+        if rdp_eps > 1e-4:
+            latlon = ob.simplify_latlon(latlon, rdp_eps)
         color = "#2ecc71" if is_selected else "#6c5ce7"
         weight = 8 if is_selected else 5
         opacity = 0.95 if is_selected else 0.75
@@ -401,11 +588,14 @@ with col_map:
             weight=weight,
             opacity=opacity,
             tooltip=_tooltip_one_line(
-                str(r["name"]), float(r["distance_km"]), str(r["difficulty"])
+                str(r.name), float(r.distance_km), str(r.difficulty)
             ),
         ).add_to(m)
 
     # 선택 코스 출발/도착(코스명 포함)
+    # 아이콘은 렌더당 새로 만든다: folium 요소는 부모 figure에 묶이는
+    # 가변 객체라 동시 세션이 공유하면 다른 문서의 정의를 참조하게 됨
+    # (렌더 자체가 캐시되므로 생성 비용은 무시할 수준)
     folium.Marker(
         location=[float(row["start_lat"]), float(row["start_lon"])],
         tooltip=f"출발: {selected_name}",
@@ -428,39 +618,47 @@ with col_map:
             tooltip="카카오 검색 기준점",
         ).add_to(m)
 
-    # 맥주: 보라 / 카페: 분홍
-    for p in kakao_beer:
-        try:
-            lat_p = float(p.get("y", 0))
-            lon_p = float(p.get("x", 0))
-        except Exception:
-            continue
-        name = p.get("place_name", "") or "맥주"
-        url = p.get("place_url", "")
-        folium.Marker(
-            location=[lat_p, lon_p],
-            popup=_kakao_popup_compact(name, url),
-            icon=folium.Icon(color="purple", icon="glass"),
-        ).add_to(m)
-
-    for p in kakao_cafe:
-        try:
-            lat_p = float(p.get("y", 0))
-            lon_p = float(p.get("x", 0))
-        except Exception:
-            continue
-        name = p.get("place_name", "") or "카페"
-        url = p.get("place_url", "")
-        folium.Marker(
-            location=[lat_p, lon_p],
-            popup=_kakao_popup_compact(name, url),
-            icon=folium.Icon(color="pink", icon="coffee"),
-        ).add_to(m)
+    # 카카오 POI는 GeoJSON 문자열 하나로 직렬화해 JS에서 L.geoJSON 한 번에 그린다
+    # (folium.GeoJson의 feature별 파이썬 오버헤드/Jinja 렌더링 생략)
+    features = _kakao_features(kakao_beer, "맥주", "beer") + _kakao_features(
+        kakao_cafe, "카페", "cafe"
+    )
+    if features:
+        fc = {"type": "FeatureCollection", "features": features}
+        colors_js = json.dumps(_KAKAO_CAT_COLORS)
+        # 지도 변수가 생성된 뒤 실행되도록 load 이벤트로 미룬다
+        poi_js = f"""
+        window.addEventListener('load', function () {{
+            var colors = {colors_js};
+            L.geoJSON({json.dumps(fc, ensure_ascii=False)}, {{
+                pointToLayer: function (feature, latlng) {{
+                    var c = colors[feature.properties.cat] || '#2d3436';
+                    return L.circleMarker(latlng, {{
+                        radius: 5, color: c, fillColor: c, fillOpacity: 0.9
+                    }});
+                }},
+                onEachFeature: function (feature, layer) {{
+                    var p = feature.properties;
+                    layer.bindPopup(
+                        "<div style='display:flex; align-items:center; gap:10px;" +
+                        " max-width:260px; white-space:nowrap;'>" +
+                        "<div style='font-weight:700; overflow:hidden;" +
+                        " text-overflow:ellipsis;'>" + p.name + "</div>" +
+                        "<a href='" + p.url + "' target='_blank'" +
+                        " style='text-decoration:none;'>상세보기</a></div>"
+                    );
+                }}
+            }}).addTo({m.get_name()});
+        }});
+        """
+        m.get_root().script.add_child(folium.Element(poi_js))
 
     # ✅ 선택 코스 화면에 맞춰 자동 이동/줌 (선택 코스 기준)
     try:
-        if elev_available and isinstance(prof, list) and len(prof) >= 2:
-            sel_latlon = [(float(p["lat"]), float(p["lon"])) for p in prof]
+        if elev_available and df_prof is not None:
+            sel_latlon = list(
+                zip(df_prof["lat"].tolist(), df_prof["lon"].tolist())
+            )
         else:
             sel_latlon = [(float(a), float(b)) for (a, b) in row["coords"]]
 
@@ -468,16 +666,38 @@ with col_map:
     except Exception:
         pass
 
-    st_folium(m, height=620, width=None)
+    return m.get_root().render()
+
+
+# ====== Layout ======
+col_map, col_side = st.columns([1.35, 1], gap="large")
+
+with col_map:
+    st.subheader("추천 코스")
+
+    # 클릭 반환값을 쓰지 않으므로 st_folium 대신 미리 렌더한 HTML을 임베드
+    # (render가 1~4초짜리라 입력이 같으면 캐시에서 바로 꺼낸다)
+    map_html = _render_map_html(
+        df_use,
+        row,
+        bbox,
+        df_prof,
+        elev_available,
+        kakao_beer,
+        kakao_cafe,
+        kakao_center,
+        rdp_eps,
+    )
+    components.html(map_html, height=620)
 
 with col_side:
     st.subheader("날씨 / 야외 적합도")
-    if not OPENWEATHER_API_KEY:
+    if not OPENWEATHER_API_KEY or f_weather is None:
         st.info("OPENWEATHER_API_KEY가 없어 날씨 패널을 숨깁니다.")
     else:
-        wlat, wlon = float(row["start_lat"]), float(row["start_lon"])
         try:
-            w = get_weather_openweather(wlat, wlon, OPENWEATHER_API_KEY)
+            # 이미 병렬 블록에서 호출됐으므로 결과만 받는다
+            w = f_weather.result()
             judge = judge_outdoor(w)
 
             msg = f"{judge['label']}  (점수 {judge['score']}/100) · {judge['desc']}"
@@ -506,7 +726,7 @@ with col_side:
     elif not elev_available:
         st.info("이 루트는 고도 정보가 없습니다.")
     else:
-        df_ele = pd.DataFrame(prof)
+        df_ele = df_prof
         st.markdown(
             """
         <div style="display:flex; justify-content:space-between; width:100%;
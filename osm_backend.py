@@ -1,20 +1,45 @@
 from __future__ import annotations
 
 import math
+import os
+import pickle
 import time
+import itertools
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
 
+import numpy as np
+import orjson
+import pandas as pd
 import requests
+from requests.adapters import HTTPAdapter
 
 UA = {
     "User-Agent": (
         "Mozilla/5.0 (Macintosh; Intel Mac OS X) AppleWebKit/537.36 "
         "(KHTML, like Gecko) Chrome/121 Safari/537.36"
-    )
+    ),
+    # requests 기본값이긴 하지만 압축/keep-alive를 명시적으로 강제
+    "Accept-Encoding": "gzip, deflate",
+    "Connection": "keep-alive",
 }
 
+# 커넥션 풀 재사용: 호출마다 TCP+TLS 핸드셰이크를 다시 하지 않는다
+# (재시도/백오프는 아래 overpass_post의 429 로직이 담당하므로 Retry는 끔)
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=8, pool_maxsize=16))
+
 # Overpass 공용 서버(429 대비 로테이션)
 OVERPASS_URLS = [
     "https://overpass-api.de/api/interpreter",
@@ -44,26 +69,131 @@ def bbox_from_center(
     return (lat - d, lon - d, lat + d, lon + d)
 
 
-def haversine_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
-    R = 6371000.0
+def haversine_m(
+    lat1: float,
+    lon1: float,
+    lat2: float,
+    lon2: float,
+    _p: float = math.pi / 180.0,
+    _r2: float = 2 * 6371000.0,
+) -> float:
+    # 상수는 기본 인자로 미리 바인딩(호출마다 나눗셈/전역 조회 없음)
+    # asin(sqrt(a)) 대신 atan2(sqrt(a), sqrt(1-a)): 비용은 비슷하지만
+    # a가 1에 가까운(대척점) 경우에도 수치적으로 안전하다
+    s1 = math.sin((lat2 - lat1) * _p * 0.5)
+    s2 = math.sin((lon2 - lon1) * _p * 0.5)
+    a = s1 * s1 + math.cos(lat1 * _p) * math.cos(lat2 * _p) * s2 * s2
+    return _r2 * math.atan2(math.sqrt(a), math.sqrt(1.0 - a))
+
+
+def haversine_m_vec(lat1, lon1, lat2, lon2):
+    """haversine_m의 배열판. 인자는 스칼라/ndarray 혼용 가능(도 단위)."""
     p = math.pi / 180.0
     dlat = (lat2 - lat1) * p
     dlon = (lon2 - lon1) * p
-    a = (math.sin(dlat / 2) ** 2) + math.cos(lat1 * p) * math.cos(lat2 * p) * (
-        math.sin(dlon / 2) ** 2
+    a = (np.sin(dlat / 2) ** 2) + np.cos(lat1 * p) * np.cos(lat2 * p) * (
+        np.sin(dlon / 2) ** 2
     )
-    return 2 * R * math.asin(math.sqrt(a))
+    return 2 * 6371000.0 * np.arcsin(np.sqrt(a))
+
+
+# 선택적 가속기: numba가 있으면 길이 계산 루프를 JIT 컴파일(없으면 NumPy 경로 사용)
+try:
+    from numba import njit as _njit
+except ImportError:
+    _njit = None
+
+if _njit is not None:
+
+    @_njit(cache=True, fastmath=True, nogil=True)
+    def _polyline_length_m_nb(lats: np.ndarray, lons: np.ndarray) -> float:
+        p = math.pi / 180.0
+        tot = 0.0
+        for i in range(1, lats.size):
+            dlat = (lats[i] - lats[i - 1]) * p
+            dlon = (lons[i] - lons[i - 1]) * p
+            a = math.sin(dlat / 2) ** 2 + math.cos(lats[i - 1] * p) * math.cos(
+                lats[i] * p
+            ) * math.sin(dlon / 2) ** 2
+            tot += 2 * 6371000.0 * math.asin(math.sqrt(a))
+        return tot
+
+else:
+    _polyline_length_m_nb = None
 
 
 def polyline_length_km(latlon: List[Tuple[float, float]]) -> float:
+    # 세그먼트별 파이썬 루프 대신 NumPy로 일괄 계산(수천 점 코스에서 수십 배 빠름)
     if len(latlon) < 2:
         return 0.0
-    dist = 0.0
-    for i in range(1, len(latlon)):
-        dist += haversine_m(
-            latlon[i - 1][0], latlon[i - 1][1], latlon[i][0], latlon[i][1]
-        )
-    return dist / 1000.0
+    arr = np.asarray(latlon, dtype=np.float64)
+    if _polyline_length_m_nb is not None and arr.shape[0] >= 64:
+        lats = np.ascontiguousarray(arr[:, 0])
+        lons = np.ascontiguousarray(arr[:, 1])
+        return float(_polyline_length_m_nb(lats, lons) / 1000.0)
+    seg_m = haversine_m_vec(arr[:-1, 0], arr[:-1, 1], arr[1:, 0], arr[1:, 1])
+    return float(seg_m.sum() / 1000.0)
+
+
+def _perp_dist_sq(
+    p: Tuple[float, float], a: Tuple[float, float], b: Tuple[float, float]
+) -> float:
+    """선분 a-b에 대한 점 p의 수직거리 제곱(도 단위 평면 근사)"""
+    ax, ay = a
+    bx, by = b
+    px, py = p
+    dx, dy = bx - ax, by - ay
+    if dx == 0.0 and dy == 0.0:
+        ex, ey = px - ax, py - ay
+        return ex * ex + ey * ey
+    t = ((px - ax) * dx + (py - ay) * dy) / (dx * dx + dy * dy)
+    t = 0.0 if t < 0.0 else (1.0 if t > 1.0 else t)
+    ex = px - (ax + t * dx)
+    ey = py - (ay + t * dy)
+    return ex * ex + ey * ey
+
+
+def rdp_indices(latlon: List[Tuple[float, float]], epsilon: float) -> List[int]:
+    """
+    Ramer–Douglas–Peucker 단순화에서 살아남는 점들의 인덱스
+    - 인덱스를 돌려주므로 고도 등 평행 배열도 같은 마스크로 줄일 수 있음
+    """
+    n = len(latlon)
+    if n < 3 or epsilon <= 0:
+        return list(range(n))
+
+    eps2 = epsilon * epsilon
+    keep = [False] * n
+    keep[0] = keep[-1] = True
+
+    stack = [(0, n - 1)]
+    while stack:
+        i, j = stack.pop()
+        if j <= i + 1:
+            continue
+        a, b = latlon[i], latlon[j]
+        dmax = -1.0
+        idx = -1
+        for k in range(i + 1, j):
+            d = _perp_dist_sq(latlon[k], a, b)
+            if d > dmax:
+                dmax = d
+                idx = k
+        if dmax > eps2:
+            keep[idx] = True
+            stack.append((i, idx))
+            stack.append((idx, j))
+
+    return [i for i, f in enumerate(keep) if f]
+
+
+def simplify_latlon(
+    latlon: List[Tuple[float, float]], epsilon: float
+) -> List[Tuple[float, float]]:
+    """지도에 그리기 전 폴리라인 점 개수를 줄인다(시각적 차이는 1px 이하)"""
+    if len(latlon) < 3:
+        return latlon
+    return [latlon[i] for i in rdp_indices(latlon, epsilon)]
 
 
 def _safe_get(d: Dict[str, Any], k: str, default: str = "") -> str:
@@ -71,18 +201,25 @@ def _safe_get(d: Dict[str, Any], k: str, default: str = "") -> str:
     return str(v).strip() if v is not None else default
 
 
+# SAC 등급은 7종뿐이라 결과를 캐시하면 strip/집합 검사도 반복하지 않는다
+_SAC_HARD = frozenset(
+    {
+        "demanding_mountain_hiking",
+        "alpine_hiking",
+        "demanding_alpine_hiking",
+        "difficult_alpine_hiking",
+    }
+)
+
+
+@lru_cache(maxsize=32)
 def _difficulty_from_sac(sac: str) -> str:
     sac = (sac or "").strip()
     if sac == "hiking":
         return "쉬움"
     if sac == "mountain_hiking":
         return "보통"
-    if sac in {
-        "demanding_mountain_hiking",
-        "alpine_hiking",
-        "demanding_alpine_hiking",
-        "difficult_alpine_hiking",
-    }:
+    if sac in _SAC_HARD:
         return "어려움"
     return ""
 
@@ -99,61 +236,135 @@ def difficulty_label(sac_hint: str, distance_km: float) -> str:
 
 
 # ===== Overpass =====
-def overpass_post(
-    query: str, timeout: int = 60, max_retries: int = 3
+# 미러 시작 순서를 돌려가며 부하를 분산
+_MIRROR_COUNTER = itertools.count()
+
+
+def _retry_after_seconds(value: str) -> Optional[float]:
+    """Retry-After 헤더 해석(초 단위 숫자와 HTTP-date 형식 모두 지원)"""
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        dt = parsedate_to_datetime(value)
+        return max(0.0, (dt - datetime.now(timezone.utc)).total_seconds())
+    except Exception:
+        return None
+
+
+def _overpass_try_one(
+    base: str, data: bytes, timeout: int, max_retries: int
 ) -> Dict[str, Any]:
     """
-    429 대응:
-    - 429면 백오프 + Retry-After(있으면 반영)
-    - 서버 로테이션
+    단일 미러에 대한 요청 + 429 백오프(Retry-After 반영)
     """
     last_err: Exception | None = None
+    wait_s = 2.0
+    for _ in range(max_retries):
+        try:
+            r = _SESSION.post(base, data=data, headers=UA, timeout=timeout)
+
+            if r.status_code == 429:
+                ra = r.headers.get("Retry-After")
+                if ra:
+                    ra_s = _retry_after_seconds(ra)
+                    if ra_s is not None:
+                        wait_s = max(wait_s, ra_s)
+                time.sleep(wait_s)
+                wait_s = min(wait_s * 2, 20.0)
+                continue
 
-    for base in OVERPASS_URLS:
-        wait_s = 2.0
-        for _ in range(max_retries):
-            try:
-                r = requests.post(
-                    base, data=query.encode("utf-8"), headers=UA, timeout=timeout
-                )
+            r.raise_for_status()
+            # 수십 MB짜리 out body geom 응답은 stdlib json보다 orjson이 2~4배 빠름
+            return orjson.loads(r.content)
 
-                if r.status_code == 429:
-                    ra = r.headers.get("Retry-After")
-                    if ra:
-                        try:
-                            wait_s = max(wait_s, float(ra))
-                        except Exception:
-                            pass
-                    time.sleep(wait_s)
-                    wait_s = min(wait_s * 2, 20.0)
-                    continue
+        except Exception as e:
+            last_err = e
+            time.sleep(min(wait_s, 10.0))
+            wait_s = min(wait_s * 1.6, 15.0)
+
+    if last_err:
+        raise last_err
+    raise RuntimeError("Overpass request failed")
 
-                r.raise_for_status()
-                return r.json()
 
-            except Exception as e:
-                last_err = e
-                time.sleep(min(wait_s, 10.0))
-                wait_s = min(wait_s * 1.6, 15.0)
+def overpass_post(
+    query: "bytes | str",
+    timeout: int = 60,
+    max_retries: int = 3,
+    hedge_after: float = 3.0,
+) -> Dict[str, Any]:
+    """
+    헤지(hedged) 요청: 1차 미러에 먼저 요청하고 hedge_after초 안에 응답이
+    없으면 다음 미러를 추가로 띄워, 먼저 성공한 응답을 쓴다.
+    - 전 미러 동시 발사보다 공용 서버 부하가 낮으면서도
+      느린/걸린 미러 하나가 전체를 timeout까지 붙잡는 일은 그대로 방지
+    - 시작 미러는 호출마다 로테이션
+    """
+    data = query if isinstance(query, bytes) else query.encode("utf-8")
+    offset = next(_MIRROR_COUNTER) % len(OVERPASS_URLS)
+    urls = OVERPASS_URLS[offset:] + OVERPASS_URLS[:offset]
+
+    ex = ThreadPoolExecutor(max_workers=len(urls))
+    pending: set = set()
+    last_err: Exception | None = None
+    try:
+        nxt = 0
+        while True:
+            if nxt < len(urls):
+                pending.add(
+                    ex.submit(_overpass_try_one, urls[nxt], data, timeout, max_retries)
+                )
+                nxt += 1
+            if not pending:
+                break
+            # 남은 미러가 있으면 hedge_after까지만 기다렸다가 하나 더 띄운다
+            wait_s = hedge_after if nxt < len(urls) else None
+            done, pending = wait(pending, timeout=wait_s, return_when=FIRST_COMPLETED)
+            for fut in done:
+                try:
+                    return fut.result()
+                except Exception as e:
+                    last_err = e
+    finally:
+        ex.shutdown(wait=False, cancel_futures=True)
 
     if last_err:
         raise last_err
     raise RuntimeError("Overpass request failed")
 
 
-def fetch_trails_relations(
-    bbox: Tuple[float, float, float, float], max_relations: int = 50
-) -> List[Dict[str, Any]]:
-    s, w, n, e = bbox
-    q = f"""
+@lru_cache(maxsize=128)
+def _overpass_post_cached(
+    query: "bytes | str", timeout: int = 60
+) -> Dict[str, Any]:
+    """
+    동일 쿼리 반복 호출은 네트워크를 건너뛴다(Overpass는 호출당 1초 이상).
+    응답 dict는 캐시에서 공유되므로 호출자는 읽기 전용으로만 다룰 것.
+    """
+    return overpass_post(query, timeout=timeout)
+
+
+@lru_cache(maxsize=256)
+def _trails_query_bytes(s: float, w: float, n: float, e: float) -> bytes:
+    # 같은 bbox 재조회/재시도 시 문자열 포맷팅 + UTF-8 인코딩을 건너뛴다
+    return f"""
     [out:json][timeout:60];
     (
       relation["route"="hiking"]({s},{w},{n},{e});
       relation["route"="foot"]({s},{w},{n},{e});
     );
     out body geom;
-    """
-    data = overpass_post(q, timeout=75)
+    """.encode("utf-8")
+
+
+def fetch_trails_relations(
+    bbox: Tuple[float, float, float, float], max_relations: int = 50
+) -> List[Dict[str, Any]]:
+    # bbox를 ~111m 단위로 반올림: 살짝 움직인 지도도 같은 캐시를 맞는다
+    s, w, n, e = (round(v, 3) for v in bbox)
+    data = _overpass_post_cached(_trails_query_bytes(s, w, n, e), timeout=75)
     elements = data.get("elements", [])
     rels = [el for el in elements if el.get("type") == "relation"]
 
@@ -163,7 +374,13 @@ def fetch_trails_relations(
 
 
 # ===== 공공데이터(GPX) 인덱스 =====
-_GPX_NS = {"g": "http://www.topografix.com/GPX/1/1"}
+# GPX 1.1 태그는 정규화된 전체 이름을 미리 만들어 두고 dict 한 번으로 로컬명을 얻는다
+# (다른 네임스페이스(GPX 1.0 등)는 rsplit 폴백)
+_GPX11 = "{http://www.topografix.com/GPX/1/1}"
+_LOCAL_TAG = {
+    _GPX11 + t: t
+    for t in ("trkpt", "wpt", "bounds", "trk", "trkseg", "metadata", "name")
+}
 
 
 def _bbox_intersects(
@@ -179,88 +396,213 @@ def _bbox_intersects(
 def _parse_gpx_bounds_and_endpoints(gpx_path: Path) -> Optional[Dict[str, Any]]:
     """
     GPX에서 metadata/bounds + 트랙 시작/끝점만 빠르게 파싱
+    - 전체 DOM을 만들지 않고 iterparse로 스트리밍(대용량 GPX 메모리 절약)
+    - 네임스페이스는 로컬 태그명으로 비교(GPX 1.0/1.1 모두 허용)
+    - 첫 trk가 닫히면 즉시 중단(metadata/wpt는 스키마상 trk보다 앞에 옴)
+    - metadata/bounds가 없으면 trkpt 범위로 bbox를 직접 계산
     반환 dict:
       name, start_lat, start_lon, end_lat, end_lon, bbox(s,w,n,e)
     """
-    try:
-        root = ET.parse(gpx_path).getroot()
-    except Exception:
-        return None
-
-    meta = root.find("g:metadata", _GPX_NS)
-    b = meta.find("g:bounds", _GPX_NS) if meta is not None else None
-    if b is None or not b.attrib:
-        return None
+    bounds: Optional[Dict[str, str]] = None
+    first_pt: Optional[Tuple[float, float]] = None
+    last_pt: Optional[Tuple[float, float]] = None
+    n_pts = 0
+    lat_min = lon_min = 1e18
+    lat_max = lon_max = -1e18
+    first_wpt_name = ""
+    last_wpt_name = ""
+    n_wpts = 0
 
     try:
-        minlat = float(b.attrib.get("minlat"))
-        minlon = float(b.attrib.get("minlon"))
-        maxlat = float(b.attrib.get("maxlat"))
-        maxlon = float(b.attrib.get("maxlon"))
+        for _, elem in ET.iterparse(str(gpx_path), events=("end",)):
+            # 네임스페이스 제거(GPX 1.1은 사전 계산된 상수, 그 외는 rsplit)
+            tag = _LOCAL_TAG.get(elem.tag) or elem.tag.rsplit("}", 1)[-1]
+            if tag == "trkpt":
+                try:
+                    lat = float(elem.attrib["lat"])
+                    lon = float(elem.attrib["lon"])
+                except Exception:
+                    elem.clear()
+                    continue
+                if first_pt is None:
+                    first_pt = (lat, lon)
+                last_pt = (lat, lon)
+                n_pts += 1
+                lat_min = min(lat_min, lat)
+                lat_max = max(lat_max, lat)
+                lon_min = min(lon_min, lon)
+                lon_max = max(lon_max, lon)
+                elem.clear()
+            elif tag == "wpt":
+                name = ""
+                for child in elem:
+                    if (
+                        _LOCAL_TAG.get(child.tag) or child.tag.rsplit("}", 1)[-1]
+                    ) == "name":
+                        name = (child.text or "").strip()
+                        break
+                if name:
+                    if n_wpts == 0:
+                        first_wpt_name = name
+                    last_wpt_name = name
+                    n_wpts += 1
+                elem.clear()
+            elif tag == "bounds":
+                bounds = dict(elem.attrib)
+                elem.clear()
+            elif tag == "trk":
+                # 스키마상 metadata/wpt가 trk 앞에 오므로 여기서 조기 종료해도 됨
+                elem.clear()
+                break
+            elif tag in ("trkseg", "metadata"):
+                # 누적된(이미 비운) 자식들까지 정리
+                elem.clear()
     except Exception:
         return None
 
-    trk = root.find("g:trk", _GPX_NS)
-    if trk is None:
-        return None
-    seg = trk.find("g:trkseg", _GPX_NS)
-    if seg is None:
-        return None
-    pts = seg.findall("g:trkpt", _GPX_NS)
-    if len(pts) < 2:
+    if n_pts < 2 or first_pt is None or last_pt is None:
         return None
 
-    try:
-        s_lat = float(pts[0].attrib["lat"])
-        s_lon = float(pts[0].attrib["lon"])
-        e_lat = float(pts[-1].attrib["lat"])
-        e_lon = float(pts[-1].attrib["lon"])
-    except Exception:
-        return None
+    if bounds:
+        try:
+            minlat = float(bounds.get("minlat"))
+            minlon = float(bounds.get("minlon"))
+            maxlat = float(bounds.get("maxlat"))
+            maxlon = float(bounds.get("maxlon"))
+        except Exception:
+            minlat, minlon, maxlat, maxlon = lat_min, lon_min, lat_max, lon_max
+    else:
+        minlat, minlon, maxlat, maxlon = lat_min, lon_min, lat_max, lon_max
 
     # 이름 우선순위: wpt name 1->last, 없으면 파일명
-    wpts = root.findall("g:wpt", _GPX_NS)
-    if wpts:
-        w1 = (wpts[0].findtext("g:name", default="", namespaces=_GPX_NS) or "").strip()
-        w2 = (wpts[-1].findtext("g:name", default="", namespaces=_GPX_NS) or "").strip()
-        name = f"{w1} → {w2}".strip(" →")
+    if n_wpts:
+        name = f"{first_wpt_name} → {last_wpt_name}".strip(" →")
     else:
         name = gpx_path.stem
 
     return {
         "name": name,
-        "start_lat": s_lat,
-        "start_lon": s_lon,
-        "end_lat": e_lat,
-        "end_lon": e_lon,
+        "start_lat": first_pt[0],
+        "start_lon": first_pt[1],
+        "end_lat": last_pt[0],
+        "end_lon": last_pt[1],
         "bbox": (minlat, minlon, maxlat, maxlon),  # (s,w,n,e)
         "path": str(gpx_path),
     }
 
 
+@dataclass
+class OfficialIndex:
+    """공식 GPX 인덱스의 SoA(Struct-of-Arrays) 표현
+
+    매칭 루프가 dict마다 좌표를 꺼내 float로 박싱하지 않도록
+    끝점과 bbox를 연속된 float64 배열 컬럼으로 들고 있는다.
+    names/paths는 배열과 같은 순서의 평행 리스트.
+    """
+
+    s_lat: np.ndarray
+    s_lon: np.ndarray
+    e_lat: np.ndarray
+    e_lon: np.ndarray
+    b_s: np.ndarray
+    b_w: np.ndarray
+    b_n: np.ndarray
+    b_e: np.ndarray
+    names: List[str]
+    paths: List[str]
+    # 매칭용 격자/끝점 배열(_endpoint_grid가 첫 매칭 때 채운다)
+    _match_cache: Optional[
+        Tuple[Dict[Tuple[int, int], List[int]], np.ndarray, List[Any]]
+    ] = field(default=None, init=False, repr=False, compare=False)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @classmethod
+    def from_records(cls, records: List[Dict[str, Any]]) -> "OfficialIndex":
+        """기존 list[dict] 인덱스를 SoA로 변환(레거시 호환 진입점)"""
+        cols: Dict[str, List[float]] = {k: [] for k in ("s_lat", "s_lon", "e_lat", "e_lon", "b_s", "b_w", "b_n", "b_e")}
+        names: List[str] = []
+        paths: List[str] = []
+        for r in records:
+            cols["s_lat"].append(float(r["start_lat"]))
+            cols["s_lon"].append(float(r["start_lon"]))
+            cols["e_lat"].append(float(r["end_lat"]))
+            cols["e_lon"].append(float(r["end_lon"]))
+            s, w, n, e = r["bbox"]
+            cols["b_s"].append(float(s))
+            cols["b_w"].append(float(w))
+            cols["b_n"].append(float(n))
+            cols["b_e"].append(float(e))
+            names.append(r.get("name") or "")
+            paths.append(str(r.get("path") or ""))
+        arrs = {k: np.asarray(v, dtype=np.float64) for k, v in cols.items()}
+        return cls(names=names, paths=paths, **arrs)
+
+
 def load_official_gpx_index(
     data_dir: str,
     bbox: Optional[Tuple[float, float, float, float]] = None,
     max_files: int = 1500,
-) -> List[Dict[str, Any]]:
+) -> OfficialIndex:
     """
     data_dir 아래의 .gpx를 스캔해서 '공식 구간 인덱스' 생성
+    - 파싱 결과를 data_dir/.gpx_index.pkl에 캐시하고 변경된 파일만 재파싱
     - bbox가 주어지면 GPX bounds 교차 여부로 1차 필터링(빠름)
     - max_files까지 로드(속도/메모리 제어)
     """
     base = Path(data_dir)
     if not base.exists():
-        return []
+        return OfficialIndex.from_records([])
 
     gpx_files = list(base.rglob("*.gpx"))
-    out: List[Dict[str, Any]] = []
 
-    picked = 0
+    # 파싱 결과 디스크 캐시: (mtime, size)가 그대로면 재파싱 없이 재사용
+    cache_path = base / ".gpx_index.pkl"
+    cache: Dict[str, Dict[str, Any]] = {}
+    try:
+        with open(cache_path, "rb") as f:
+            cache = pickle.load(f)
+    except Exception:
+        cache = {}
+
+    stats: Dict[str, Tuple[float, int]] = {}
+    to_parse: List[Path] = []
     for p in gpx_files:
-        if picked >= max_files:
-            break
+        key = str(p)
+        try:
+            st = p.stat()
+        except OSError:
+            continue
+        stats[key] = (st.st_mtime, st.st_size)
+        ent = cache.get(key)
+        if ent is None or ent.get("mtime") != st.st_mtime or ent.get("size") != st.st_size:
+            to_parse.append(p)
+
+    if to_parse:
+        # XML 파싱은 GIL을 잡는 CPU 작업이라 스레드 대신 프로세스풀로 병렬화
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as ex:
+            # chunksize로 파일을 묶어 보내 프로세스 간 IPC 왕복을 줄인다
+            for p, info in zip(
+                to_parse,
+                ex.map(_parse_gpx_bounds_and_endpoints, to_parse, chunksize=32),
+            ):
+                key = str(p)
+                mtime, size = stats[key]
+                cache[key] = {"mtime": mtime, "size": size, "info": info}
+
+        # 삭제된 파일 항목 정리 후 캐시 갱신(실패해도 동작에는 지장 없음)
+        cache = {k: v for k, v in cache.items() if k in stats}
+        try:
+            with open(cache_path, "wb") as f:
+                pickle.dump(cache, f, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            pass
 
-        info = _parse_gpx_bounds_and_endpoints(p)
+    out: List[Dict[str, Any]] = []
+    for p in gpx_files:
+        ent = cache.get(str(p))
+        info = ent.get("info") if ent else None
         if not info:
             continue
 
@@ -269,15 +611,78 @@ def load_official_gpx_index(
                 continue
 
         out.append(info)
-        picked += 1
+        if len(out) >= max_files:
+            break
 
-    return out
+    return OfficialIndex.from_records(out)
+
+
+# ===== 끝점 그리드 인덱스(매칭 후보 공간 프리필터) =====
+_GRID_CELL_DEG = 0.01  # 셀 한 변 ~1.1km (매칭 임계값 250m보다 충분히 큼)
+
+# 레거시 list[dict] 인덱스의 변환 결과. 원본 리스트를 강한 참조로 함께 들고
+# 있어 가비지 컬렉션 후 같은 주소의 새 리스트가 남의 캐시를 물려받는 일이 없다.
+_LEGACY_INDEX_CACHE: Dict[int, Tuple[List[Dict[str, Any]], "OfficialIndex"]] = {}
+
+
+def _grid_key(lat: float, lon: float) -> Tuple[int, int]:
+    return (int(lat // _GRID_CELL_DEG), int(lon // _GRID_CELL_DEG))
+
+
+def _endpoint_grid(
+    official_index: "OfficialIndex | List[Dict[str, Any]]",
+) -> Tuple[Dict[Tuple[int, int], List[int]], np.ndarray, List[Any]]:
+    """공식 구간 시작/끝점의 격자 인덱스 + float64 끝점 배열(인덱스당 1회 생성)
+
+    격자/배열은 OfficialIndex 인스턴스에 붙여 수명을 같이한다: id 기반
+    모듈 캐시와 달리 인덱스가 여러 개 살아 있어도 서로 밀어내지 않고,
+    객체가 사라지면 캐시도 함께 사라진다.
+    """
+    if not isinstance(official_index, OfficialIndex):
+        # 레거시 list[dict] 호환: 직전 리스트 하나만 변환 결과를 유지
+        key = id(official_index)
+        ent = _LEGACY_INDEX_CACHE.get(key)
+        if ent is None or ent[0] is not official_index:
+            _LEGACY_INDEX_CACHE.clear()
+            ent = (official_index, OfficialIndex.from_records(official_index))
+            _LEGACY_INDEX_CACHE[key] = ent
+        official_index = ent[1]
+
+    cached = official_index._match_cache
+    if cached is None:
+        oi = official_index
+        ep = np.column_stack([oi.s_lat, oi.s_lon, oi.e_lat, oi.e_lon])
+        grid: Dict[Tuple[int, int], List[int]] = {}
+        for i in range(len(oi)):
+            grid.setdefault(_grid_key(oi.s_lat[i], oi.s_lon[i]), []).append(i)
+            grid.setdefault(_grid_key(oi.e_lat[i], oi.e_lon[i]), []).append(i)
+        cached = (grid, ep, oi.names)
+        official_index._match_cache = cached
+    return cached
+
+
+def _grid_candidates(
+    grid: Dict[Tuple[int, int], List[int]],
+    points: List[Tuple[float, float]],
+    threshold_m: float,
+) -> List[int]:
+    reach_lat = int(threshold_m / 111000.0 / _GRID_CELL_DEG) + 1
+    cand: set = set()
+    for la, lo in points:
+        # 경도 1도는 위도에 따라 111km*cos(lat)로 줄어드므로 탐색 반경을 보정
+        cos_lat = max(math.cos(la * math.pi / 180.0), 0.1)
+        reach_lon = int(threshold_m / (111000.0 * cos_lat) / _GRID_CELL_DEG) + 1
+        ci, cj = _grid_key(la, lo)
+        for di in range(-reach_lat, reach_lat + 1):
+            for dj in range(-reach_lon, reach_lon + 1):
+                cand.update(grid.get((ci + di, cj + dj), ()))
+    return sorted(cand)
 
 
 def match_official_by_endpoints(
     course_start: Tuple[float, float],
     course_end: Tuple[float, float],
-    official_index: List[Dict[str, Any]],
+    official_index: "OfficialIndex | List[Dict[str, Any]]",
 ) -> Dict[str, Any]:
     """
     OSM 코스 start/end가 공식 GPX 구간 start/end와 가까우면 매칭
@@ -295,28 +700,54 @@ def match_official_by_endpoints(
     s_lat, s_lon = course_start
     e_lat, e_lon = course_end
 
-    best_nearest = 1e18
-    best_name = None
-
-    for r in official_index:
-        os_lat, os_lon = float(r["start_lat"]), float(r["start_lon"])
-        oe_lat, oe_lon = float(r["end_lat"]), float(r["end_lon"])
-
-        d1 = (
-            haversine_m(s_lat, s_lon, os_lat, os_lon)
-            + haversine_m(e_lat, e_lon, oe_lat, oe_lon)
-        ) / 2.0
-        d2 = (
-            haversine_m(s_lat, s_lon, oe_lat, oe_lon)
-            + haversine_m(e_lat, e_lon, os_lat, os_lon)
-        ) / 2.0
-        nearest = min(d1, d2)
+    # 격자 프리필터: 임계값 내에 있을 수 있는 후보만 추린다(O(N) -> O(k))
+    th = float(_OFFICIAL_MATCH_THRESHOLD_M)
+    grid, ep_all, names = _endpoint_grid(official_index)
+    cand = _grid_candidates(grid, [(s_lat, s_lon), (e_lat, e_lon)], th)
+    if not cand:
+        return {
+            "matched": False,
+            "trust_score": 0.0,
+            "nearest_m": None,
+            "official_name": None,
+        }
 
-        if nearest < best_nearest:
-            best_nearest = nearest
-            best_name = r.get("name")
+    # 후보에 대해서만 haversine을 브로드캐스트(배열은 캐시에서 행만 취함)
+    ep = ep_all[np.asarray(cand, dtype=np.intp)]
+
+    # 값싼 '도 단위 제곱거리' 하한으로 트리그 없이 한 번 더 걸러낸다:
+    # 평균거리 ≤ th 가 되려면 코스 시작점이 정방향 시작점 또는 역방향 끝점과
+    # 2*th 안에는 있어야 한다(여유분 2배를 더 곱해 근사 오차 흡수)
+    th_deg = th / 111000.0
+    lim = (4.0 * th_deg) ** 2
+    cos_lat = math.cos(s_lat * math.pi / 180.0)
+    d_ss = (ep[:, 0] - s_lat) ** 2 + ((ep[:, 1] - s_lon) * cos_lat) ** 2
+    d_se = (ep[:, 2] - s_lat) ** 2 + ((ep[:, 3] - s_lon) * cos_lat) ** 2
+    keep = (d_ss < lim) | (d_se < lim)
+    if not keep.any():
+        return {
+            "matched": False,
+            "trust_score": 0.0,
+            "nearest_m": None,
+            "official_name": None,
+        }
+    if not keep.all():
+        ep = ep[keep]
+        cand = [c for c, k in zip(cand, keep) if k]
+    d1 = (
+        haversine_m_vec(s_lat, s_lon, ep[:, 0], ep[:, 1])
+        + haversine_m_vec(e_lat, e_lon, ep[:, 2], ep[:, 3])
+    ) / 2.0
+    d2 = (
+        haversine_m_vec(s_lat, s_lon, ep[:, 2], ep[:, 3])
+        + haversine_m_vec(e_lat, e_lon, ep[:, 0], ep[:, 1])
+    ) / 2.0
+    nearest = np.minimum(d1, d2)
+
+    best_i = int(np.argmin(nearest))
+    best_nearest = float(nearest[best_i])
+    best_name = names[cand[best_i]]
 
-    th = float(_OFFICIAL_MATCH_THRESHOLD_M)
     if best_nearest <= th:
         trust = 5.0 + (th - best_nearest) / th * 25.0  # 5~30
         return {
@@ -337,7 +768,7 @@ def match_official_by_endpoints(
 # ===== 코스 생성(공식 매칭 포함) =====
 def relation_to_course(
     rel: Dict[str, Any],
-    official_index: Optional[List[Dict[str, Any]]] = None,
+    official_index: "OfficialIndex | List[Dict[str, Any]] | None" = None,
 ) -> Optional[Dict[str, Any]]:
     tags = rel.get("tags") or {}
     name = _safe_get(tags, "name", "")
@@ -346,29 +777,42 @@ def relation_to_course(
 
     sac = _safe_get(tags, "sac_scale", "")
 
-    latlon: List[Tuple[float, float]] = []
     members = rel.get("members") or []
 
-    for m in members:
-        geom = m.get("geometry") or []
+    # 멤버별 좌표를 ndarray 청크로 모아 마지막에 한 번만 이어붙인다
+    # (list.extend로 수천 점을 키우는 것보다 싸고, 길이 계산도 배열로 바로)
+    chunks: List[np.ndarray] = []
+    for mem in members:
+        geom = mem.get("geometry") or []
         pts = [
             (float(p["lat"]), float(p["lon"]))
             for p in geom
             if "lat" in p and "lon" in p
         ]
         if len(pts) >= 2:
-            if latlon:
-                if haversine_m(latlon[-1][0], latlon[-1][1], pts[0][0], pts[0][1]) < 5:
-                    latlon.extend(pts[1:])
-                else:
-                    latlon.extend(pts)
-            else:
-                latlon.extend(pts)
+            chunks.append(np.asarray(pts, dtype=np.float64))
 
-    if len(latlon) < 2:
+    if not chunks:
         return None
 
-    dist_km = round(polyline_length_km(latlon), 2)
+    if len(chunks) > 1:
+        # 경계 간격을 한 번의 배열 haversine으로 구하고,
+        # 직전 청크 끝점과 이어지는 경계는 중복점 하나를 떨어뜨리고 연결
+        tails = np.asarray([c[-1] for c in chunks[:-1]])
+        heads = np.asarray([c[0] for c in chunks[1:]])
+        gaps = haversine_m_vec(tails[:, 0], tails[:, 1], heads[:, 0], heads[:, 1])
+        parts = [chunks[0]] + [
+            c[1:] if gaps[i] < 5 else c for i, c in enumerate(chunks[1:])
+        ]
+    else:
+        parts = chunks
+
+    arr = np.concatenate(parts)
+    if arr.shape[0] < 2:
+        return None
+
+    latlon = [tuple(p) for p in arr.tolist()]
+    dist_km = round(polyline_length_km(arr), 2)
     if dist_km < 1.0 or dist_km > 35.0:
         return None
 
@@ -402,7 +846,9 @@ def relation_to_course(
         "official_matched": bool(m["matched"]),
         "official_nearest_m": m["nearest_m"],
         "official_name": m["official_name"],
-        "coords": latlon,  # [(lat, lon), ...]
+        "coords": latlon,  # [(lat, lon), ...] 원본(고도 프로파일 등 분석용)
+        # 지도 표시용 단순화 좌표(줌 12 기준 시각 차이 없음)
+        "coords_simplified": simplify_latlon(latlon, 1e-4),
         "start_lat": start[0],
         "start_lon": start[1],
         "end_lat": end[0],
@@ -414,22 +860,27 @@ def relation_to_course(
 def build_courses(
     bbox: Tuple[float, float, float, float],
     max_relations: int = 50,
-    official_index: Optional[List[Dict[str, Any]]] = None,
+    official_index: "OfficialIndex | List[Dict[str, Any]] | None" = None,
 ) -> List[Dict[str, Any]]:
     rels = fetch_trails_relations(bbox, max_relations=max_relations)
-    courses: List[Dict[str, Any]] = []
+
+    # 같은 이름의 릴레이션(슈퍼루트/변형)이 흔하므로 수집 단계에서 바로
+    # 최고 점수 변형만 남기고, 정렬은 중복 제거 후 한 번만 한다
+    best: Dict[str, Dict[str, Any]] = {}
     for r in rels:
         c = relation_to_course(r, official_index=official_index)
-        if c:
-            courses.append(c)
-
-    courses.sort(key=lambda x: (x["score"], x["distance_km"]), reverse=True)
-
-    dedup: Dict[str, Dict[str, Any]] = {}
-    for c in courses:
-        if c["name"] not in dedup:
-            dedup[c["name"]] = c
-    return list(dedup.values())
+        if not c:
+            continue
+        prev = best.get(c["name"])
+        if prev is None or (c["score"], c["distance_km"]) > (
+            prev["score"],
+            prev["distance_km"],
+        ):
+            best[c["name"]] = c
+
+    return sorted(
+        best.values(), key=lambda x: (x["score"], x["distance_km"]), reverse=True
+    )
 
 
 # ===== 주변 장소(카페/펍) =====
@@ -485,30 +936,89 @@ def extract_place(
     }
 
 
+@lru_cache(maxsize=512)
+def _places_query_bytes(lat: float, lon: float, radius_m: int) -> bytes:
+    return overpass_places_query(lat, lon, radius_m).encode("utf-8")
+
+
 def places_near(lat: float, lon: float, radius_m: int) -> List[Dict[str, Any]]:
-    q = overpass_places_query(lat, lon, radius_m)
-    data = overpass_post(q, timeout=60)
+    q = _places_query_bytes(round(lat, 3), round(lon, 3), radius_m)
+    data = _overpass_post_cached(q, timeout=60)
     elements = data.get("elements", [])
 
-    places = [p for p in (extract_place(el, lat, lon) for el in elements) if p]
-    for p in places:
-        dist_score = 1 - (p["distance_m"] / max(1, radius_m))
-        p["combined_score"] = round(
-            dist_score * 0.6 + (p["quality_score"] / 5) * 0.4, 3
-        )
+    # 1차 통과: 유효 노드만 평행 리스트로 수집하고,
+    # 거리/점수는 요소별 스칼라 호출 대신 배열 연산으로 한 번에 계산
+    names: List[str] = []
+    cats: List[str] = []
+    lats: List[float] = []
+    lons: List[float] = []
+    ohs: List[str] = []
+    webs: List[str] = []
+    quality: List[int] = []
+    for el in elements:
+        if el.get("type") != "node":
+            continue
+        tags = el.get("tags") or {}
+        name = tags.get("name")
+        la = el.get("lat")
+        lo = el.get("lon")
+        if not name or la is None or lo is None:
+            continue
+        names.append(str(name))
+        cats.append("coffee" if tags.get("amenity", "") == "cafe" else "beer")
+        lats.append(float(la))
+        lons.append(float(lo))
+        oh = tags.get("opening_hours", "")
+        web = tags.get("website") or tags.get("contact:website") or ""
+        ohs.append(oh)
+        webs.append(web)
+        q_ = 2 * bool(oh) + 2 * bool(web)
+        if tags.get("addr:street") or tags.get("addr:full"):
+            q_ += 1
+        quality.append(min(5, q_))
+
+    if not names:
+        return []
 
-    places.sort(key=lambda x: x["combined_score"], reverse=True)
-    return places
+    lat_arr = np.asarray(lats, dtype=np.float64)
+    lon_arr = np.asarray(lons, dtype=np.float64)
+    dists = haversine_m_vec(lat, lon, lat_arr, lon_arr).astype(np.int64)
+    qual = np.asarray(quality, dtype=np.float64)
+    combined = (1 - dists / max(1, radius_m)) * 0.6 + (qual / 5) * 0.4
+    order = np.argsort(-combined, kind="stable")
+
+    return [
+        {
+            "name": names[i],
+            "category": cats[i],
+            "lat": lats[i],
+            "lon": lons[i],
+            "distance_m": int(dists[i]),
+            "quality_score": quality[i],
+            "opening_hours": ohs[i],
+            "website": webs[i],
+            # np.round는 이진 표현 경계값에서 round()와 다르게 떨어질 수 있어
+            # 표시값은 기존과 동일하게 파이썬 round로 맞춘다
+            "combined_score": round(float(combined[i]), 3),
+        }
+        for i in order
+    ]
 
 
 # ===== ORS 고도 프로파일 =====
 def _sample_latlon(
-    latlon: List[Tuple[float, float]], max_points: int = 1800
-) -> List[Tuple[float, float]]:
+    latlon: "np.ndarray | List[Tuple[float, float]]", max_points: int = 1800
+) -> "np.ndarray | List[Tuple[float, float]]":
+    """최대 max_points개로 다운샘플. ndarray는 복사 없는 스트라이드 뷰로 자른다."""
     n = len(latlon)
     if n <= max_points:
         return latlon
     step = max(1, n // max_points)
+    if isinstance(latlon, np.ndarray):
+        sampled = latlon[::step]
+        if not np.array_equal(sampled[-1], latlon[-1]):
+            sampled = np.vstack([sampled, latlon[-1:]])
+        return sampled
     sampled = latlon[::step]
     if sampled and sampled[-1] != latlon[-1]:
         sampled.append(latlon[-1])
@@ -527,8 +1037,11 @@ def ors_elevation_line(
     if not api_key:
         raise ValueError("ORS_API_KEY is empty")
 
-    latlon = _sample_latlon(latlon, max_points=min(ORS_MAX_VERTICES - 50, 1800))
-    coords_lonlat = [[float(lon), float(lat)] for (lat, lon) in latlon]
+    # (lat, lon) -> [lon, lat] 변환도 파이썬 루프 대신 배열 컬럼 스왑으로
+    arr = np.asarray(latlon, dtype=np.float64).reshape(-1, 2)
+    arr = _sample_latlon(arr, max_points=min(ORS_MAX_VERTICES - 50, 1800))
+    # orjson이 ndarray를 직접 직렬화하므로 파이썬 리스트로 풀지 않는다
+    coords_lonlat = np.ascontiguousarray(arr[:, ::-1])
 
     payload = {
         "format_in": "geojson",
@@ -538,7 +1051,12 @@ def ors_elevation_line(
     }
     headers = {"Authorization": api_key, "Content-Type": "application/json", **UA}
 
-    r = requests.post(ORS_ELEVATION_LINE_URL, json=payload, headers=headers, timeout=60)
+    r = _SESSION.post(
+        ORS_ELEVATION_LINE_URL,
+        data=orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY),
+        headers=headers,
+        timeout=60,
+    )
     r.raise_for_status()
     data = r.json()
 
@@ -555,41 +1073,31 @@ def ors_elevation_line(
 
 def elevation_profile(
     latlon: List[Tuple[float, float]], api_key: str
-) -> List[Dict[str, float]]:
+) -> pd.DataFrame:
     """
     고도 프로파일(ORS elevation/line)
     입력: [(lat, lon), ...]
-    출력: [{"dist_km":.., "elev_m":.., "lat":.., "lon":..}, ...]
+    출력: columns = dist_km, elev_m, lat, lon (점 개수만큼의 행)
+    - dict 리스트 대신 컬럼형 DataFrame으로 바로 돌려줘서
+      UI의 재변환(수천 개 dict 할당)을 없앤다.
     - 지도에서 고도에 따라 색을 칠하려면 lat/lon이 필요해서 함께 반환합니다.
     """
+    cols = ["dist_km", "elev_m", "lat", "lon"]
     coords3d = ors_elevation_line(latlon, api_key=api_key)
     if len(coords3d) < 2:
-        return []
-
-    prof: List[Dict[str, float]] = []
-    dist_km = 0.0
-
-    # 첫 점
-    prof.append(
-        {
-            "dist_km": 0.0,
-            "elev_m": float(coords3d[0][2]),
-            "lat": float(coords3d[0][0]),
-            "lon": float(coords3d[0][1]),
-        }
+        return pd.DataFrame(columns=cols)
+
+    # 점별 스칼라 haversine 루프 대신 누적거리를 한 번에 계산
+    # (cumsum/round는 결과 버퍼에 바로 써서 중간 배열 할당도 생략)
+    arr = np.asarray(coords3d, dtype=np.float64)
+    lats, lons, eles = arr[:, 0], arr[:, 1], arr[:, 2]
+    seg_m = haversine_m_vec(lats[:-1], lons[:-1], lats[1:], lons[1:])
+    dist_km = np.empty(arr.shape[0], dtype=np.float64)
+    dist_km[0] = 0.0
+    np.cumsum(seg_m, out=dist_km[1:])
+    dist_km[1:] /= 1000.0
+    np.round(dist_km, 4, out=dist_km)
+
+    return pd.DataFrame(
+        {"dist_km": dist_km, "elev_m": eles, "lat": lats, "lon": lons}
     )
-
-    for i in range(1, len(coords3d)):
-        prev = coords3d[i - 1]
-        cur = coords3d[i]
-        dist_km += haversine_m(prev[0], prev[1], cur[0], cur[1]) / 1000.0
-        prof.append(
-            {
-                "dist_km": round(dist_km, 4),
-                "elev_m": float(cur[2]),
-                "lat": float(cur[0]),
-                "lon": float(cur[1]),
-            }
-        )
-
-    return prof
@@ -25,6 +25,19 @@ USER_AGENT = (
     "Chrome/144.0.0.0 Safari/537.36"
 )
 
+# 자주 쓰는 패턴은 호출마다 컴파일하지 않도록 모듈 수준에서 미리 컴파일
+_BLOG_URL_RES = [
+    re.compile(r"blogId=([^&]+)&logNo=(\d+)"),
+    re.compile(r"blog.naver.com/([^/]+)/(\d+)"),
+    re.compile(r"m.blog.naver.com/([^/]+)/(\d+)"),
+]
+_SCRIPT_RE = re.compile(r"(?is)<script.*?>.*?</script>")
+_STYLE_RE = re.compile(r"(?is)<style.*?>.*?</style>")
+_TAG_RE = re.compile(r"(?is)<[^>]+>")
+_SPACE_RE = re.compile(r"[ \t]+")
+_NEWLINE_RE = re.compile(r"\n{2,}")
+_SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?])\s+|\n+")
+
 
 def ensure_dir(path: str) -> None:
     if not os.path.isdir(path):
@@ -54,13 +67,8 @@ def fetch_html(url: str) -> str:
 
 
 def parse_blog_id_logno(url: str) -> tuple[str, str] | tuple[None, None]:
-    patterns = [
-        r"blogId=([^&]+)&logNo=(\d+)",
-        r"blog.naver.com/([^/]+)/(\d+)",
-        r"m.blog.naver.com/([^/]+)/(\d+)",
-    ]
-    for p in patterns:
-        m = re.search(p, url)
+    for p in _BLOG_URL_RES:
+        m = p.search(url)
         if m:
             return m.group(1), m.group(2)
     return None, None
@@ -72,20 +80,20 @@ def build_post_url(blog_id: str, log_no: str) -> str:
 
 def strip_html(text: str) -> str:
     # script/style 제거
-    text = re.sub(r"(?is)<script.*?>.*?</script>", " ", text)
-    text = re.sub(r"(?is)<style.*?>.*?</style>", " ", text)
+    text = _SCRIPT_RE.sub(" ", text)
+    text = _STYLE_RE.sub(" ", text)
     # 태그 제거
-    text = re.sub(r"(?is)<[^>]+>", " ", text)
+    text = _TAG_RE.sub(" ", text)
     # 엔티티 처리
     text = html.unescape(text)
     # 공백 정리
-    text = re.sub(r"[ \t]+", " ", text)
-    text = re.sub(r"\n{2,}", "\n", text)
+    text = _SPACE_RE.sub(" ", text)
+    text = _NEWLINE_RE.sub("\n", text)
     return text.strip()
 
 
 def extract_course_snippets(text: str) -> list[str]:
-    sentences = re.split(r"(?<=[.!?])\s+|\n+", text)
+    sentences = _SENTENCE_SPLIT_RE.split(text)
     keywords = ["코스", "루트", "경로", "산책로"]
     return [s.strip() for s in sentences if any(k in s for k in keywords)]
 